@@ -1,10 +1,11 @@
 import io
 import json
 import logging
-import inspect
 import sys
 import os
 
+from twisted.internet import reactor
+
 from utility_functions import (
     recursive_dictionary_update,
     path,
@@ -24,7 +25,12 @@ class ConfigurationManager(object):
     logger.addHandler(logfile_handle)
     logfile_handle.setFormatter(log_format)
 
+    save_delay = 1.0
+
     def __init__(self):
+        self._dirty = False
+        self._save_pending = None
+        self._last_saved = None
         default_config_path = path.preauthChild(
             os.path.join('config', 'config.json.default')
         )
@@ -52,9 +58,10 @@ class ConfigurationManager(object):
 
         if self.config_path.exists():
             try:
-                with self.config_path.open() as c:
-                    config = json.load(c)
-                    self.config = recursive_dictionary_update(default, config)
+                content = self.config_path.getContent().decode('utf-8')
+                config = json.loads(content)
+                self.config = recursive_dictionary_update(default, config)
+                self._last_saved = content
             except ValueError as e:
                 print 'Error: %s' % e
                 self.logger.critical(
@@ -96,30 +103,57 @@ class ConfigurationManager(object):
         self.save()
 
     def save(self):
+        """
+        Writes the configuration file to disk immediately, cancelling any
+        pending delayed save. Nothing is written if the serialized
+        configuration matches what was last saved.
+        """
+        if self._save_pending is not None and self._save_pending.active():
+            self._save_pending.cancel()
+        self._save_pending = None
+        self._dirty = False
         try:
+            data = json.dumps(
+                self.config,
+                indent=4,
+                separators=(',', ': '),
+                sort_keys=True,
+                ensure_ascii=False
+            )
+            if data == self._last_saved:
+                return
             with io.open(self.config_path.path, 'w') as config:
                 self.logger.debug('Writing configuration file.')
-                config.write(
-                    json.dumps(
-                        self.config,
-                        indent=4,
-                        separators=(',', ': '),
-                        sort_keys=True,
-                        ensure_ascii=False
-                    )
-                )
+                config.write(data)
+            self._last_saved = data
         except Exception as e:
             self.logger.critical(
                 'Tried to save the configuration file, failed.\n%s', str(e)
             )
             raise
 
+    def mark_dirty(self):
+        """
+        Flags the configuration as changed and schedules a save. Changes made
+        within `save_delay` seconds of each other are written out together.
+        """
+        self._dirty = True
+        if self._save_pending is None:
+            self._save_pending = reactor.callLater(
+                self.save_delay, self._flush
+            )
+
+    def _flush(self):
+        self._save_pending = None
+        if self._dirty:
+            self.save()
+
     def __getattr__(self, item):
         if item in ['config', 'config_path']:
             return super(ConfigurationManager, self).__getattribute__(item)
 
         elif item == 'plugin_config':
-            caller = inspect.stack()[1][0].f_locals['self'].__class__.name
+            caller = sys._getframe(1).f_locals['self'].__class__.name
             if caller in self.config['plugin_config']:
                 return self.config['plugin_config'][caller]
             else:
@@ -138,13 +172,13 @@ class ConfigurationManager(object):
     def __setattr__(self, key, value):
         if key == 'config':
             super(ConfigurationManager, self).__setattr__(key, value)
-            self.save()
-        elif key == 'config_path':
+            self.mark_dirty()
+        elif key == 'config_path' or key.startswith('_'):
             super(ConfigurationManager, self).__setattr__(key, value)
         elif key == 'plugin_config':
-            caller = inspect.stack()[1][0].f_locals['self'].__class__.name
+            caller = sys._getframe(1).f_locals['self'].__class__.name
             self.config['plugin_config'][caller] = value
-            self.save()
+            self.mark_dirty()
         else:
             self.config[key] = value
-            self.save()
+            self.mark_dirty()
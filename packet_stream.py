@@ -5,6 +5,12 @@ import datetime
 import packets
 
 
+# Construct parsers are stateless, so build them once and reuse them.
+START_PACKET = packets.start_packet()
+PACKET = packets.packet()
+SIGNED_VLQ = packets.SignedVLQ('')
+
+
 class Packet(object):
     def __init__(
         self,
@@ -53,15 +59,15 @@ class PacketStream(object):
     def start_packet(self):
         try:
             if len(self._stream) > 2 and self.payload_size is None:
-                packet_header = packets.start_packet().parse(self._stream)
+                packet_header = START_PACKET.parse(self._stream)
                 self.id = packet_header.id
                 self.payload_size = abs(packet_header.payload_size)
                 if packet_header.payload_size < 0:
                     self.compressed = True
                 else:
                     self.compressed = False
-                self.header_length = 1 + len(packets.SignedVLQ('').build(
-                    packet_header.payload_size)
+                self.header_length = 1 + len(
+                    SIGNED_VLQ.build(packet_header.payload_size)
                 )
                 self.packet_size = self.payload_size + self.header_length
                 return True
@@ -79,7 +85,7 @@ class PacketStream(object):
                 self._stream = self._stream[self.packet_size:]
                 if not self._stream:
                     self._stream = ''
-                p_parsed = packets.packet().parse(p)
+                p_parsed = PACKET.parse(p)
                 if self.compressed:
                     try:
                         z = zlib.decompressobj()
@@ -5,9 +5,9 @@ functionality in StarryPy.
 import inspect
 import logging
 import sys
+from collections import defaultdict, deque
 
 from twisted.internet import reactor
-from twisted.internet.task import deferLater
 
 from base_plugin import BasePlugin
 from config import ConfigurationManager
@@ -40,6 +40,35 @@ class UnresolvedOrCircularDependencyError(Exception):
     """
 
 
+class DetachedPluginConfig(dict):
+    """
+    Stands in for the config['plugin_config'] entry of a plugin that has
+    none, so that importing a plugin doesn't add an empty section to the
+    user's config.json. The section is added the first time a value is
+    stored in it.
+    """
+
+    def __init__(self, sections, name):
+        super(DetachedPluginConfig, self).__init__()
+        self._sections = sections
+        self._name = name
+
+    def _attach(self):
+        self._sections.setdefault(self._name, self)
+
+    def __setitem__(self, key, value):
+        self._attach()
+        super(DetachedPluginConfig, self).__setitem__(key, value)
+
+    def update(self, *args, **kwargs):
+        self._attach()
+        super(DetachedPluginConfig, self).update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self._attach()
+        return super(DetachedPluginConfig, self).setdefault(key, default)
+
+
 class PluginManager(object):
     logger = logging.getLogger('starrypy.plugin_manager.PluginManager')
 
@@ -52,10 +81,12 @@ class PluginManager(object):
 
         :param base_class: The base class to use while searching for plugins.
         """
-        self.packets = {}
+        self.packets = defaultdict(lambda: defaultdict(dict))
+        self.dispatch = {}
         self.plugins = {}
         self.plugin_classes = {}
         self.plugins_waiting_to_load = {}
+        self.imported_plugins = set()
 
         self.load_order = []
 
@@ -109,18 +140,32 @@ class PluginManager(object):
     def import_plugin(self, name):
         """
         Import plugin that has the given name, and is a subclass of base_class.
+        Plugins that have already been imported are skipped, and classes that
+        are already registered (such as base classes imported into a plugin's
+        namespace) are left untouched.
 
         :param name: The name of the plugin to import.
         """
+        if name in self.imported_plugins:
+            return
         try:
             mod = __import__(name, globals(), locals(), [], 0)
-            for _, plugin in inspect.getmembers(mod, inspect.isclass):
+            for plugin in vars(mod).values():
                 if (
+                        inspect.isclass(plugin) and
                         issubclass(plugin, self.base_class) and
                         (plugin is not self.base_class) and
-                        (plugin not in self.plugin_classes.iterkeys())
+                        (plugin.name not in self.plugin_classes)
                 ):
                     plugin.config = self.config
+                    sections = self.config.config.setdefault(
+                        'plugin_config', {}
+                    )
+                    plugin.plugin_config = sections.get(plugin.name)
+                    if plugin.plugin_config is None:
+                        plugin.plugin_config = DetachedPluginConfig(
+                            sections, plugin.name
+                        )
                     plugin.factory = self.factory
                     plugin.active = False
                     plugin.protocol = None
@@ -129,6 +174,7 @@ class PluginManager(object):
                         'starrypy.plugins.{}'.format(plugin.name)
                     )
                     self.plugin_classes[plugin.name] = plugin
+            self.imported_plugins.add(name)
 
         except ImportError:
             self.logger.critical('Import error for %s\n', name)
@@ -143,39 +189,45 @@ class PluginManager(object):
         self.plugins_waiting_to_load = {}
         self.load_order = []
 
+        # Kahn's algorithm: dependencies on plugins that are already loaded
+        # count as met, everything else is an edge in the graph.
+        indegree = {}
+        reverse_deps = defaultdict(list)
+        for name, depends in dependency_hash.iteritems():
+            pending = [dep for dep in depends if dep not in self.plugins]
+            indegree[name] = len(pending)
+            for dep in pending:
+                reverse_deps[dep].append(name)
+
+        ready = deque(name for name, n in indegree.iteritems() if n == 0)
+
         try:
-            while len(dependency_hash) > 0:
-                ready = [
-                    x for x, d in dependency_hash.iteritems() if len(d) == 0
-                ]
-                if not ready:
-                    ex = []
-                    for n, d in dependency_hash.iteritems():
-                        for dep in d:
+            while ready:
+                name = ready.popleft()
+                self.plugins_waiting_to_load[name] = self.plugin_classes[name]
+                self.load_order.append(name)
+                for dependent in reverse_deps[name]:
+                    indegree[dependent] -= 1
+                    if indegree[dependent] == 0:
+                        ready.append(dependent)
+
+            if len(self.load_order) < len(indegree):
+                ex = []
+                for n, d in dependency_hash.iteritems():
+                    if n in self.plugins_waiting_to_load:
+                        continue
+                    for dep in d:
+                        if dep not in self.plugins_waiting_to_load and \
+                                dep not in self.plugins:
                             ex.append(
                                 'Dependency of {} on {} not met\n'.format(
                                     n, dep
                                 )
                             )
-                    raise UnresolvedOrCircularDependencyError(
-                        'Unresolved or circular dependencies'
-                        ' found:\n{}'.format('\n'.join(ex))
-                    )
-                for name in ready:
-                    self.plugins_waiting_to_load[name] = (
-                        self.plugin_classes[name]
-                    )
-                    self.load_order.append(name)
-                    del dependency_hash[name]
-                for name, depends in dependency_hash.iteritems():
-                    plugin_set = set(
-                        self.plugins.iterkeys()
-                    ).union(
-                        set(self.plugins_waiting_to_load.iterkeys())
-                    )
-                    dependency_hash[name] = dependency_hash[name].difference(
-                        plugin_set
-                    )
+                raise UnresolvedOrCircularDependencyError(
+                    'Unresolved or circular dependencies'
+                    ' found:\n{}'.format('\n'.join(ex))
+                )
 
         except UnresolvedOrCircularDependencyError as e:
             self.logger.critical(str(e))
@@ -250,24 +302,26 @@ class PluginManager(object):
         if protocol is None:
             return True
 
-        return_values = []
-        packets = self.packets.get(data.id, {}).get(when, {}).itervalues()
-        for plugin, packet_method in packets:
+        handlers = self.dispatch.get((data.id, when))
+        if not handlers:
+            return True
+
+        logger = self.logger
+        result = True
+        for plugin, packet_method in handlers:
             try:
                 plugin.protocol = protocol
                 res = packet_method(data)
                 if res is False:
                     return False
-                elif res is None:
-                    res = True
-
-                return_values.append(res)
+                elif res is not None and not res:
+                    result = False
             except:
-                self.logger.exception(
+                logger.exception(
                     'Error in plugin %s with function %s.',
                     str(plugin), packet_method.__name__
                 )
-        return all(return_values)
+        return result
 
     def die(self):
         self.deactivate_plugins()
@@ -278,11 +332,10 @@ class PluginManager(object):
         """
         for packet_id, when_dict in plugin.overridden_packets.iteritems():
             for when, packet_method in when_dict.iteritems():
-                self.packets.setdefault(
-                    packet_id, {}
-                ).setdefault(
-                    when, {}
-                )[plugin.name] = (plugin, packet_method)
+                self.packets[packet_id][when][plugin.name] = (
+                    plugin, packet_method
+                )
+                self.update_dispatch(packet_id, when)
 
     def de_map_plugin_packets(self, plugin):
         """
@@ -292,32 +345,34 @@ class PluginManager(object):
             for when, plugins in when_dict.iteritems():
                 if plugin.name in plugins:
                     plugins.pop(plugin.name)
+                    self.update_dispatch(packet_id, when)
+
+    def update_dispatch(self, packet_id, when):
+        """
+        Rebuilds the flat (packet_id, when) -> handlers lookup used by `do`
+        from the packets dictionary.
+        """
+        handlers = tuple(self.packets[packet_id][when].itervalues())
+        if handlers:
+            self.dispatch[(packet_id, when)] = handlers
+        else:
+            self.dispatch.pop((packet_id, when), None)
 
 
 def route(func):
     """
     This decorator is used to map methods to appropriate plugin calls.
     """
-    logger = logging.getLogger('starrypy.plugin_manager.route')
-
     def wrapped_function(self, data):
         res = self.plugin_manager.do(self, 'on', data)
         if res:
             res = func(self, data)
-            d = deferLater(
-                reactor,
-                .01,
-                self.plugin_manager.do,
-                self,
-                'after',
-                data
-            )
-            d.addErrback(print_this_defered_failure)
+            if (data.id, 'after') in self.plugin_manager.dispatch:
+                reactor.callLater(
+                    0, self.plugin_manager.do, self, 'after', data
+                )
         return res
 
-    def print_this_defered_failure(f):
-        logger.error('Deferred function failure. %s', f)
-
     return wrapped_function
 
 
@@ -25,8 +25,8 @@ class AFKCommand(SimpleCommandPlugin):
 
     def load_config(self):
         try:
-            self.afk_message = self.config.plugin_config['afk_msg']
-            self.afkreturn_message = self.config.plugin_config['afkreturn_msg']
+            self.afk_message = self.plugin_config['afk_msg']
+            self.afkreturn_message = self.plugin_config['afkreturn_msg']
         except Exception as e:
             self.logger.error('Error occured! %s', e)
             if self.protocol is not None:
@@ -16,16 +16,17 @@ class ClaimsPlugin(SimpleCommandPlugin):
     def activate(self):
         super(ClaimsPlugin, self).activate()
         try:
-            self.max_claims = self.config.plugin_config['max_claims']
+            self.max_claims = self.plugin_config['max_claims']
         except KeyError:
             self.max_claims = 5
-        self.unclaimable_planets = self.config.plugin_config.get(
+        self.unclaimable_planets = self.plugin_config.get(
             'unclaimable_planets', []
         )
-        self.protected_planets = self.config.config['plugin_config'][
-            'planet_protect']['protected_planets']
-        self.player_planets = self.config.config['plugin_config'][
-            'planet_protect']['player_planets']
+        # Share planet_protect's live state rather than its config entries,
+        # which it only refreshes when saving.
+        self.planet_protect = self.plugins['planet_protect']
+        self.protected_planets = self.planet_protect.protected_planets
+        self.player_planets = self.planet_protect.player_planets
         self.player_manager = self.plugins[
             'player_manager_plugin'
         ].player_manager
@@ -154,7 +155,7 @@ class ClaimsPlugin(SimpleCommandPlugin):
                 )
                 return
             if planet not in self.protected_planets:
-                self.protected_planets.append(planet)
+                self.protected_planets.add(planet)
                 self.protocol.send_chat_message('Planet successfully claimed.')
                 self.logger.info('Protected planet %s', planet)
                 my_storage['claims'] = int(my_storage['claims']) + 1
@@ -330,14 +331,9 @@ class ClaimsPlugin(SimpleCommandPlugin):
         self.save()
 
     def save(self):
-        self.config.config['plugin_config']['planet_protect'].update(
-            {
-                'protected_planets': self.protected_planets,
-                'player_planets': self.player_planets
-            }
-        )
+        self.planet_protect.save()
 
-        self.config.plugin_config.update(
+        self.plugin_config.update(
             {
                 'max_claims': self.max_claims,
                 'unclaimable_planets': self.unclaimable_planets
@@ -1,3 +1,4 @@
+import logging
 import pprint
 import socket
 
@@ -9,6 +10,18 @@ from packets import chat_sent
 from utility_functions import give_item_to_player, extract_name
 
 
+CHAT_SENT = chat_sent()
+
+# Rank name given to /promote -> method that applies it.
+RANK_METHODS = {
+    'owner': 'make_owner',
+    'admin': 'make_admin',
+    'moderator': 'make_mod',
+    'registered': 'make_registered',
+    'guest': 'make_guest'
+}
+
+
 class UserCommandPlugin(SimpleCommandPlugin):
     """
     Provides a simple chat interface to the user manager.
@@ -33,10 +46,8 @@ class UserCommandPlugin(SimpleCommandPlugin):
         Displays all current players on the server.
         Syntax: /who
         """
-        who = [
-            w.colored_name(self.config.colors)
-            for w in self.player_manager.who()
-        ]
+        colors = self.config.colors
+        who = [w.colored_name(colors) for w in self.player_manager.who()]
         self.protocol.send_chat_message(
             '^cyan;{}^green; players online: {}'.format(
                 len(who), ', '.join(who)
@@ -50,10 +61,12 @@ class UserCommandPlugin(SimpleCommandPlugin):
         Displays who is on your current planet.
         Syntax: /planet
         """
+        colors = self.config.colors
         who = [
-            w.colored_name(self.config.colors)
-            for w in self.player_manager.who()
-            if w.planet == self.protocol.player.planet and not w.on_ship
+            w.colored_name(colors)
+            for w in self.player_manager.on_planet(
+                self.protocol.player.planet
+            )
         ]
         self.protocol.send_chat_message(
             '^cyan;{}^green; players on planet: {}'.format(
@@ -145,22 +158,21 @@ class UserCommandPlugin(SimpleCommandPlugin):
             player = self.player_manager.get_by_name(name)
             self.logger.debug(
                 'Player object in promote command, found by name, is %s.',
-                str(player)
+                player
             )
             if player is not None:
-                self.logger.debug(
-                    'Player object was not None. '
-                    'Dump of player object follows.'
-                )
-                for line in pprint.pformat(player).split('\n'):
-                    self.logger.debug('\t%s', line)
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(
+                        'Player object was not None. '
+                        'Dump of player object follows.'
+                    )
+                    for line in pprint.pformat(player).split('\n'):
+                        self.logger.debug('\t%s', line)
                 old_rank = player.access_level
-                players = self.player_manager.all()
-                if old_rank == 1000:
-                    owner_count = 0
-                    for aclvl in players:
-                        if aclvl.access_level == old_rank:
-                            owner_count += 1
+                if old_rank == UserLevels.OWNER:
+                    owner_count = self.player_manager.count_by_access_level(
+                        old_rank
+                    )
                     if owner_count <= 1:
                         self.protocol.send_chat_message(
                             'You are the only (or last) owner. Promote denied!'
@@ -179,16 +191,9 @@ class UserCommandPlugin(SimpleCommandPlugin):
                         'are at least at an equal level as you.'
                     )
                     return
-                if rank == 'owner':
-                    self.make_owner(player)
-                elif rank == 'admin':
-                    self.make_admin(player)
-                elif rank == 'moderator':
-                    self.make_mod(player)
-                elif rank == 'registered':
-                    self.make_registered(player)
-                elif rank == 'guest':
-                    self.make_guest(player)
+                method_name = RANK_METHODS.get(rank)
+                if method_name is not None:
+                    getattr(self, method_name)(player)
                 else:
                     self.logger.debug(
                         'Non-existent rank. Returning with a help message.'
@@ -310,11 +315,10 @@ class UserCommandPlugin(SimpleCommandPlugin):
         try:
             ip = data[0]
             socket.inet_aton(ip)
-            print socket.inet_aton(ip)
             self.logger.debug('Banning IP address %s', ip)
             self.player_manager.ban(ip)
             self.protocol.send_chat_message(
-                'Banned IP: ^red;%s^green;'.format(ip)
+                'Banned IP: ^red;{}^green;'.format(ip)
             )
             self.logger.warning(
                 '%s banned IP: %s', self.protocol.player.name, ip
@@ -413,7 +417,7 @@ class UserCommandPlugin(SimpleCommandPlugin):
             )
         else:
             self.protocol.send_chat_message(
-                'Couldn\'t find a user by the name ^yellow;%s^green;.'.format(
+                'Couldn\'t find a user by the name ^yellow;{}^green;.'.format(
                     name
                 )
             )
@@ -590,11 +594,17 @@ class MuteManager(BasePlugin):
     name = 'mute_manager'
 
     def on_chat_sent(self, data):
-        data = chat_sent().parse(data.data)
+        if not self.protocol.player.muted:
+            return True
+        # The prefixes come from the JSON config as unicode; comparing them
+        # to the raw bytes would decode those as ASCII. Malformed bytes are
+        # replaced rather than raising, which would let the message through.
+        message = CHAT_SENT.parse(data.data).message.decode(
+            'utf-8', 'replace'
+        )
         if (
-                self.protocol.player.muted and
-                data.message[0] != self.config.command_prefix and
-                data.message[:2] != self.config.chat_prefix * 2
+                not message.startswith(self.config.command_prefix) and
+                not message.startswith(self.config.chat_prefix * 2)
         ):
             self.protocol.send_chat_message(
                 'You are currently ^red;muted^green; and cannot speak. '
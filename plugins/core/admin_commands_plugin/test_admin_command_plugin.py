@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from plugins.core.admin_commands_plugin.admin_command_plugin import (
+    MuteManager
+)
+
+
+class MuteManagerTestCase(TestCase):
+    def setUp(self):
+        self.plugin = MuteManager()
+        self.plugin.config = Mock(command_prefix=u'/', chat_prefix=u'#')
+        self.plugin.protocol = Mock()
+        self.plugin.protocol.player.muted = True
+
+    @patch(
+        'plugins.core.admin_commands_plugin.admin_command_plugin.CHAT_SENT'
+    )
+    def test_on_chat_sent_not_muted(self, mock_chat_sent):
+        self.plugin.protocol.player.muted = False
+
+        self.assertTrue(self.plugin.on_chat_sent(Mock(data='test data')))
+        self.assertFalse(mock_chat_sent.parse.called)
+
+    @patch(
+        'plugins.core.admin_commands_plugin.admin_command_plugin.CHAT_SENT'
+    )
+    def test_on_chat_sent_muted_non_ascii(self, mock_chat_sent):
+        mock_chat_sent.parse.return_value = Mock(
+            message=u'café'.encode('utf-8')
+        )
+
+        self.assertFalse(self.plugin.on_chat_sent(Mock(data='test data')))
+        mock_chat_sent.parse.assert_called_with('test data')
+        self.assertTrue(self.plugin.protocol.send_chat_message.called)
+
+    @patch(
+        'plugins.core.admin_commands_plugin.admin_command_plugin.CHAT_SENT'
+    )
+    def test_on_chat_sent_muted_invalid_utf8(self, mock_chat_sent):
+        mock_chat_sent.parse.return_value = Mock(message='caf\xe9 \xff')
+
+        self.assertFalse(self.plugin.on_chat_sent(Mock(data='test data')))
+        self.assertTrue(self.plugin.protocol.send_chat_message.called)
+
+    @patch(
+        'plugins.core.admin_commands_plugin.admin_command_plugin.CHAT_SENT'
+    )
+    def test_on_chat_sent_muted_command(self, mock_chat_sent):
+        mock_chat_sent.parse.return_value = Mock(
+            message=u'/whois café'.encode('utf-8')
+        )
+
+        self.assertTrue(self.plugin.on_chat_sent(Mock(data='test data')))
+        self.assertFalse(self.plugin.protocol.send_chat_message.called)
+
+    @patch(
+        'plugins.core.admin_commands_plugin.admin_command_plugin.CHAT_SENT'
+    )
+    def test_on_chat_sent_muted_admin_chat(self, mock_chat_sent):
+        mock_chat_sent.parse.return_value = Mock(
+            message=u'##café'.encode('utf-8')
+        )
+
+        self.assertTrue(self.plugin.on_chat_sent(Mock(data='test data')))
+        self.assertFalse(self.plugin.protocol.send_chat_message.called)
@@ -2,6 +2,9 @@ from base_plugin import BasePlugin
 from packets import chat_sent
 
 
+CHAT_SENT = chat_sent()
+
+
 class CommandDispatchPlugin(BasePlugin):
     name = 'command_plugin'
 
@@ -9,17 +12,39 @@ class CommandDispatchPlugin(BasePlugin):
         super(CommandDispatchPlugin, self).activate()
         self.commands = {}
         self.command_prefix = self.config.command_prefix
+        self.raw_command_prefix = self.command_prefix.encode('utf-8')
+
+    def is_command(self, raw):
+        """
+        Checks whether a raw chat_sent payload starts with the command prefix
+        without parsing the whole packet. The message is a star_string, so
+        skip over its VLQ length to find the first byte of the text.
+        """
+        for start, byte in enumerate(raw):
+            if not ord(byte) & 0x80:
+                return raw.startswith(self.raw_command_prefix, start + 1)
+        return False
 
     def on_chat_sent(self, data):
-        data = chat_sent().parse(data.data)
+        if not self.is_command(data.data):
+            return True
+        data = CHAT_SENT.parse(data.data)
         data.message = data.message.decode('utf-8')
         if data.message.startswith(self.command_prefix):
-            split_command = data.message[1:].split()
-            command = split_command[0]
+            split_command = data.message[len(self.command_prefix):].split(
+                None, 1
+            )
+            if not split_command:
+                return True
+            command = split_command[0].lower()
             try:
                 if command in self.commands:
+                    if len(split_command) > 1:
+                        args = split_command[1].split()
+                    else:
+                        args = []
                     self.commands[command].__self__.protocol = self.protocol
-                    self.commands[command](split_command[1:])
+                    self.commands[command](args)
                     self.logger.info(
                         'Command sent: <%s> %s',
                         self.protocol.player.name,
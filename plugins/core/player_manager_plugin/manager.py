@@ -1,13 +1,13 @@
 from contextlib import contextmanager
 import datetime
 from functools import wraps
-import inspect
 import logging
 import json
 import sqlite3
+import sys
 
 from sqlalchemy.ext.mutable import Mutable
-from sqlalchemy.orm import sessionmaker, relationship, backref
+from sqlalchemy.orm import sessionmaker, relationship, backref, deferred
 from sqlalchemy import (
     create_engine,
     Column,
@@ -16,6 +16,7 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Boolean,
+    Index,
     func,
     exc
 )
@@ -104,6 +105,23 @@ def migrate_db(config):
             dbcur.execute('UPDATE `players` SET `admin_logged_in`=0;')
             dbcon.commit()
 
+    try:
+        dbcur.execute(
+            'CREATE INDEX IF NOT EXISTS `players_name_lower` '
+            'ON `players` (lower(`name`));'
+        )
+        dbcur.execute(
+            'CREATE INDEX IF NOT EXISTS `players_org_name_lower` '
+            'ON `players` (lower(`org_name`));'
+        )
+        dbcur.execute(
+            'CREATE INDEX IF NOT EXISTS `players_planet` '
+            'ON `players` (`planet`);'
+        )
+        dbcon.commit()
+    except sqlite3.OperationalError:
+        pass
+
     dbcon.close()
 
 
@@ -154,6 +172,11 @@ class _UserLevels(object):
 
 UserLevels = _UserLevels()
 
+# Access level -> key of its color in the colors config section.
+_LEVEL_COLOR_KEY = {
+    lvl: name.lower() for name, lvl in _UserLevels.ranks.iteritems()
+}
+
 
 class MutableDict(Mutable, dict):
     @classmethod
@@ -217,16 +240,32 @@ class Player(Base):
     client_id = Column(Integer)
     party_id = Column(String)
     ip = Column(String)
-    plugin_storage = Column(JSONEncodedDict, default=dict())
+    # Deferred so that the per-access refresh in RecordWithAttachedSession
+    # doesn't decode the JSON blob unless a plugin actually reads storage.
+    plugin_storage = deferred(Column(JSONEncodedDict, default=dict()))
     planet = Column(String)
     on_ship = Column(Boolean)
     muted = Column(Boolean)
 
     ips = relationship('IPAddress', order_by='IPAddress.id', backref='players')
 
+    # Colored names already built, keyed on (access_level, name). Shared by
+    # all instances, since every query hands back fresh Player objects, and
+    # thrown away whenever a different colors dict is passed in.
+    _colored_names = {}
+    _colored_names_colors = None
+
     def colored_name(self, colors):
+        if colors is not Player._colored_names_colors:
+            Player._colored_names = {}
+            Player._colored_names_colors = colors
+        key = (self.access_level, self.name)
+        try:
+            return Player._colored_names[key]
+        except KeyError:
+            pass
         logger.vdebug('Building colored name.')
-        color = colors[UserLevels(self.access_level).lower()]
+        color = colors[_LEVEL_COLOR_KEY[self.access_level]]
         logger.vdebug('Color is %s', color)
         name = self.name
         logger.vdebug('Name is %s', name)
@@ -236,11 +275,13 @@ class Player(Base):
             name,
             colors['default']
         )
-        return '{}{}{}'.format(color, name, colors['default'])
+        colored = '{}{}{}'.format(color, name, colors['default'])
+        Player._colored_names[key] = colored
+        return colored
 
     @property
     def storage(self):
-        caller = inspect.stack()[2][0].f_locals['self'].__class__.name
+        caller = sys._getframe(2).f_locals['self'].__class__.name
         if self.plugin_storage is None:
             self.plugin_storage = {}
         try:
@@ -251,7 +292,7 @@ class Player(Base):
 
     @storage.setter
     def storage(self, store):
-        caller = inspect.stack()[2][0].f_locals['self'].__class__.name
+        caller = sys._getframe(2).f_locals['self'].__class__.name
         self.plugin_storage[caller] = store
 
     def as_dict(self):
@@ -260,6 +301,11 @@ class Player(Base):
         return d
 
 
+Index('players_name_lower', func.lower(Player.name))
+Index('players_org_name_lower', func.lower(Player.org_name))
+Index('players_planet', Player.planet)
+
+
 class IPAddress(Base):
     __tablename__ = 'ips'
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -291,13 +337,17 @@ class PlayerManager(object):
         Base.metadata.create_all(self.engine)
         self.sessionmaker = sessionmaker(bind=self.engine, autoflush=True)
         with _autoclosing_session(self.sessionmaker) as session:
-            query = session.query(Player).filter_by(logged_in=True).all()
-            for player in query:
-                player.logged_in = False
-                player.admin_logged_in = False
-                player.party_id = ''
-                player.protocol = None
-                session.commit()
+            session.query(Player).filter_by(logged_in=True).update(
+                {
+                    Player.logged_in: False,
+                    Player.admin_logged_in: False,
+                    Player.party_id: '',
+                    Player.protocol: None
+                },
+                synchronize_session=False
+            )
+            session.commit()
+            self._banned_ips = set(ip for ip, in session.query(Ban.ip))
 
     def _cache_and_return_from_session(
         self,
@@ -331,13 +381,15 @@ class PlayerManager(object):
         protocol=None
     ):
         with _autoclosing_session(self.sessionmaker) as session:
-            query = session.query(Player).filter_by(uuid=uuid, logged_in=True)
-            if query.first():
-                raise AlreadyLoggedIn
+            # Bans are checked against memory, so do those before going to
+            # the database.
             if self.check_bans(ip):
                 raise Banned
             if self.check_bans(org_name):
                 raise Banned
+            query = session.query(Player).filter_by(uuid=uuid, logged_in=True)
+            if session.query(query.exists()).scalar():
+                raise AlreadyLoggedIn
 
             player = session.query(Player).filter_by(uuid=uuid).first()
 
@@ -346,7 +398,7 @@ class PlayerManager(object):
                 if player.name != name:
                     logger.info('Detected username change.')
                     player.name = name
-                if not query.first():
+                if not session.query(query.exists()).scalar():
                     logger.debug(
                         'New ip address detected for user. Adding to database.'
                     )
@@ -395,6 +447,22 @@ class PlayerManager(object):
                 collection=True,
             )
 
+    def on_planet(self, planet):
+        """
+        Returns the logged in players currently on the given planet (not
+        aboard their ship).
+        """
+        with _autoclosing_session(self.sessionmaker) as session:
+            return self._cache_and_return_from_session(
+                session,
+                session.query(Player).filter(
+                    Player.logged_in,
+                    Player.planet == planet,
+                    Player.on_ship.isnot(True)
+                ).all(),
+                collection=True,
+            )
+
     def all(self):
         with _autoclosing_session(self.sessionmaker) as session:
             return self._cache_and_return_from_session(
@@ -403,6 +471,12 @@ class PlayerManager(object):
                 collection=True,
             )
 
+    def count_by_access_level(self, access_level):
+        with _autoclosing_session(self.sessionmaker) as session:
+            return session.query(Player).filter_by(
+                access_level=access_level
+            ).count()
+
     def all_like(self, regex):
         with _autoclosing_session(self.sessionmaker) as session:
             return self._cache_and_return_from_session(
@@ -423,21 +497,24 @@ class PlayerManager(object):
             return session.query(Ban).all()
 
     def check_bans(self, ip):
-        with _autoclosing_session(self.sessionmaker) as session:
-            return session.query(Ban).filter_by(ip=ip).first() is not None
+        return ip in self._banned_ips
 
     def unban(self, ip):
+        if ip not in self._banned_ips:
+            return
         with _autoclosing_session(self.sessionmaker) as session:
             res = session.query(Ban).filter_by(ip=ip).first()
             if res is None:
                 return
             session.delete(res)
             session.commit()
+        self._banned_ips.discard(ip)
 
     def ban(self, ip):
         with _autoclosing_session(self.sessionmaker) as session:
             session.add(Ban(ip=ip))
             session.commit()
+        self._banned_ips.add(ip)
 
     @property
     def bans(self):
@@ -448,9 +525,11 @@ class PlayerManager(object):
             )
 
     def delete_ban(self, ban_cache):
+        ip = ban_cache.ip
         with _autoclosing_session(self.sessionmaker) as session:
             session.delete(ban_cache.record)
             session.commit()
+        self._banned_ips.discard(ip)
 
     def get_by_name(self, name):
         with _autoclosing_session(self.sessionmaker) as session:
@@ -495,6 +574,9 @@ def permissions(level=UserLevels.OWNER):
     Provides a decorator to enable/disable permissions based on user level.
     """
 
+    level_int = int(level)
+    needs_admin_login = level_int >= UserLevels.MODERATOR
+
     def wrapper(f):
         f.level = level
 
@@ -503,8 +585,8 @@ def permissions(level=UserLevels.OWNER):
             if self.protocol is None:
                 return False
 
-            if self.protocol.player.access_level >= level:
-                if level >= UserLevels.MODERATOR:
+            if self.protocol.player.access_level >= level_int:
+                if needs_admin_login:
                     if self.protocol.player.admin_logged_in == 0:
                         self.protocol.send_chat_message(
                             '^red;You\'re not logged in, so I can\'t '
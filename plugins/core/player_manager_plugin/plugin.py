@@ -24,15 +24,16 @@ class PlayerManagerPlugin(SimpleCommandPlugin):
         self.player_manager = PlayerManager(self.config)
         self.l_call = LoopingCall(self.check_logged_in)
         self.l_call.start(1, now=False)
-        self.regexes = self.config.plugin_config['name_removal_regexes']
-        self.adminss = self.config.plugin_config['admin_ss']
+        self.regexes = self.plugin_config['name_removal_regexes']
+        self.adminss = self.plugin_config['admin_ss']
 
     def deactivate(self):
         del self.player_manager
 
     def check_logged_in(self):
+        protocols = self.factory.protocols
         for player in self.player_manager.who():
-            if player.protocol not in self.factory.protocols.keys():
+            if player.protocol not in protocols:
                 player.logged_in = False
                 player.admin_logged_in = False
                 player.party_id = ''
@@ -178,7 +179,7 @@ class PlayerManagerPlugin(SimpleCommandPlugin):
                 self.protocol.player.uuid,
                 self.protocol.transport.getPeer().host
             )
-        except:
+        except Exception:
             self.logger.exception(
                 'Exception in on_connect_success, '
                 'player info may not have been logged.'
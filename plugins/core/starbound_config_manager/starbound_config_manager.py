@@ -1,9 +1,22 @@
-import json
-
 from twisted.python.filepath import FilePath
 
 from base_plugin import SimpleCommandPlugin
 from plugin_manager import FatalPluginError
+from utility_functions import fast_json
+
+
+# Parsed starbound.config files, keyed by path, as (mtime, data).
+_starbound_config_cache = {}
+
+
+def _load_starbound_config(configuration_file):
+    mtime = configuration_file.getModificationTime()
+    cached = _starbound_config_cache.get(configuration_file.path)
+    if cached is None or cached[0] != mtime:
+        with configuration_file.open() as f:
+            cached = (mtime, fast_json.loads(f.read()))
+        _starbound_config_cache[configuration_file.path] = cached
+    return cached[1]
 
 
 class StarboundConfigManager(SimpleCommandPlugin):
@@ -27,8 +40,7 @@ class StarboundConfigManager(SimpleCommandPlugin):
                 ' is not set in the configuration.'
             )
         try:
-            with configuration_file.open() as f:
-                starbound_config = json.load(f)
+            starbound_config = _load_starbound_config(configuration_file)
         except Exception as e:
             raise FatalPluginError(
                 'Could not parse the starbound configuration file as JSON.'
@@ -17,28 +17,26 @@ class IrcPlugin(BasePlugin):
     def activate(self):
         super(IrcPlugin, self).activate()
 
-        self.server = self.config.plugin_config['server']
+        self.server = self.plugin_config['server']
 
         try:
-            self.port = int(self.config.plugin_config['port'])
+            self.port = int(self.plugin_config['port'])
         except (AttributeError, ValueError):
             self.port = 6667
 
-        self.nickname = self.config.plugin_config[
-            'bot_nickname'
-        ].encode('utf-8')
-        self.channel = self.config.plugin_config['channel'].encode('utf-8')
-        if 'nickserv_password' in self.config.plugin_config:
-            self.nickserv_password = self.config.plugin_config[
+        self.nickname = self.plugin_config['bot_nickname'].encode('utf-8')
+        self.channel = self.plugin_config['channel'].encode('utf-8')
+        if 'nickserv_password' in self.plugin_config:
+            self.nickserv_password = self.plugin_config[
                 'nickserv_password'
             ].encode('utf-8')
         else:
             self.nickserv_password = None
 
-        self.echo_from_channel = self.config.plugin_config['echo_from_channel']
+        self.echo_from_channel = self.plugin_config['echo_from_channel']
 
         self.colors_with_irc_color = self.config.colors
-        self.colors_with_irc_color['irc'] = self.config.plugin_config['color']
+        self.colors_with_irc_color['irc'] = self.plugin_config['color']
 
         if not getattr(self, 'irc_factory', None):
             self.irc_factory = StarryPyIrcBotFactory(
@@ -14,14 +14,15 @@ class MOTDPlugin(SimpleCommandPlugin):
     def activate(self):
         super(MOTDPlugin, self).activate()
         try:
-            self._motd = unicode(self.config.plugin_config['motd'])
+            self._motd = unicode(self.plugin_config['motd'])
         except KeyError:
             self.logger.warning(
                 'Couldn\'t read message of the day from config. '
                 'Setting default.'
             )
             self._motd = 'Welcome to the server! Play nice.'
-            self.config.plugin_config['motd'] = self._motd
+            self.plugin_config['motd'] = self._motd
+            self.config.mark_dirty()
 
     def after_connect_success(self, data):
         self.send_motd()
@@ -47,7 +48,8 @@ class MOTDPlugin(SimpleCommandPlugin):
         """
         try:
             self._motd = ' '.join(motd).encode('utf-8')
-            self.config.plugin_config['motd'] = self._motd
+            self.plugin_config['motd'] = self._motd
+            self.config.mark_dirty()
             self.logger.info('MOTD changed to: %s', self._motd)
             self.send_motd()
         except:
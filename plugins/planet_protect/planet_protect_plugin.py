@@ -1,13 +1,37 @@
+from functools import wraps
+
 from base_plugin import SimpleCommandPlugin
 from plugins.core.player_manager_plugin import UserLevels, permissions
 from packets import (
+    Packets,
     entity_create,
     EntityType,
     star_string,
     entity_interact_result,
     InteractionType
 )
-from utility_functions import extract_name
+from utility_functions import extract_name, VDEBUG_LVL
+
+
+ENTITY_CREATE = entity_create()
+ENTITY_INTERACT_RESULT = entity_interact_result()
+STAR_STRING = star_string('')
+
+
+def restricted_only(f):
+    """
+    Runs the decorated packet hook only for players restricted by planet
+    protection (see PlanetProtectPlugin.is_restricted); the packet is let
+    through for everyone else without calling it.
+    """
+
+    @wraps(f)
+    def wrapper(self, data):
+        if self.is_restricted():
+            return f(self, data)
+        return True
+
+    return wrapper
 
 
 class PlanetProtectPlugin(SimpleCommandPlugin):
@@ -22,40 +46,77 @@ class PlanetProtectPlugin(SimpleCommandPlugin):
 
     def activate(self):
         super(PlanetProtectPlugin, self).activate()
-        bad_packets = self.config.plugin_config.get('bad_packets', [])
-        for n in ['on_' + n.lower() for n in bad_packets]:
-            setattr(self, n, (lambda x: self.planet_check()))
+        # Handlers set on the instance are invisible to the packet mapping
+        # done at class creation, so register a single shared handler for
+        # the configured packets directly; the plugin manager maps
+        # overridden_packets right after activation.
+        check = self.planet_check
+        handler = lambda data: check()
+        for packet_name in self.plugin_config.get('bad_packets', []):
+            packet = getattr(Packets, packet_name, None)
+            if packet is None:
+                self.logger.warning(
+                    'Unknown packet %s in bad_packets, ignoring.', packet_name
+                )
+                continue
+            self.overridden_packets.setdefault(packet.value, {})['on'] = (
+                handler
+            )
 
-        self.protected_planets = self.config.plugin_config.get(
-            'protected_planets', []
+        self.protected_planets = set(
+            self.plugin_config.get('protected_planets', [])
         )
-        self.player_planets = self.config.plugin_config.get(
+        self.player_planets = self.plugin_config.get(
             'player_planets', {}
         )
-        self.blacklist = self.config.plugin_config.get('blacklist', [])
+        self.blacklist = set(self.plugin_config.get('blacklist', []))
         self.player_manager = self.plugins[
             'player_manager_plugin'
         ].player_manager
-        self.protect_everything = self.config.plugin_config.get(
+        self.protect_everything = self.plugin_config.get(
             'protect_everything', []
         )
         self.block_all = False
+        self.index_players()
+        self.saved_state = self.state()
+
+    def deactivate(self):
+        super(PlanetProtectPlugin, self).deactivate()
+        self.save()
+
+    def location(self):
+        """
+        Returns (on_ship, planet) for the current protocol's player. Both
+        only change on a world start, so they are cached on the protocol
+        (and go away with it) instead of being read from the player record
+        on every packet.
+        """
+        protocol = self.protocol
+        location = getattr(protocol, 'planet_protect_location', None)
+        if location is None:
+            player = protocol.player
+            location = (player.on_ship, player.planet)
+            protocol.planet_protect_location = location
+        return location
+
+    def after_world_start(self, data):
+        self.protocol.planet_protect_location = None
 
     def planet_check(self):
-        if self.protocol.player.on_ship:
+        if not self.protected_planets and not self.protect_everything:
             return True
-        elif (
-                self.protocol.player.planet in self.protected_planets and
-                self.protocol.player.access_level < UserLevels.ADMIN
+        on_ship, planet = self.location()
+        if on_ship:
+            return True
+        player = self.protocol.player
+        if (
+                planet in self.protected_planets and
+                player.access_level < UserLevels.ADMIN
         ):
-            name = self.protocol.player.org_name
-            if name in self.player_planets[self.protocol.player.planet]:
-                return True
-            else:
-                return False
+            return (planet, player.org_name) in self.planet_players
         elif (
                 self.protect_everything and
-                self.protocol.player.access_level < UserLevels.REGISTERED
+                player.access_level < UserLevels.REGISTERED
         ):
             return False
         else:
@@ -79,7 +140,7 @@ class PlanetProtectPlugin(SimpleCommandPlugin):
             addplayer = data[0]
             try:
                 addplayer, rest = extract_name(data)
-                self.logger.info('name: %s', str(addplayer))
+                self.logger.info('name: %s', addplayer)
                 addplayer = self.player_manager.get_by_name(addplayer).org_name
                 first_name_color = self.player_manager.get_by_org_name(
                     addplayer
@@ -90,7 +151,7 @@ class PlanetProtectPlugin(SimpleCommandPlugin):
                 )
                 return
 
-        first_name = str(addplayer)
+        first_name = addplayer
 
         try:
             if first_name in self.player_planets[self.protocol.player.planet]:
@@ -110,16 +171,13 @@ class PlanetProtectPlugin(SimpleCommandPlugin):
             )
             return
         if planet not in self.protected_planets:
-            self.protected_planets.append(planet)
+            self.protected_planets.add(planet)
             self.protocol.send_chat_message('Planet successfully protected.')
             self.logger.info('Protected planet %s', planet)
             if first_name:
-                if planet not in self.player_planets:
-                    self.player_planets[planet] = [first_name]
-                else:
-                    self.player_planets[planet] = (
-                        self.player_planets[planet] + [first_name]
-                    )
+                names = self.player_planets.setdefault(planet, [])
+                if first_name not in names:
+                    names.append(first_name)
                 self.protocol.send_chat_message(
                     'Adding ^yellow;%s^green; to planet list'.format(
                         first_name_color
@@ -129,12 +187,9 @@ class PlanetProtectPlugin(SimpleCommandPlugin):
             if first_name:
                 self.protocol.send_chat_message('Planet is already protected!')
             else:
-                if planet not in self.player_planets:
-                    self.player_planets[planet] = [first_name]
-                else:
-                    self.player_planets[planet] = (
-                        self.player_planets[planet] + [first_name]
-                    )
+                names = self.player_planets.setdefault(planet, [])
+                if first_name not in names:
+                    names.append(first_name)
                 self.protocol.send_chat_message(
                     'Adding ^yellow;%s^green; to planet list'.format(
                         first_name_color
@@ -175,8 +230,6 @@ class PlanetProtectPlugin(SimpleCommandPlugin):
             self.protocol.send_chat_message(
                 'Players registered to this planet: ^green;{}'.format(
                     '^yellow;, ^green;'.join(self.player_planets[planet])
-                    .replace('[', '')
-                    .replace(']', '')
                 )
             )
         else:
@@ -200,7 +253,7 @@ class PlanetProtectPlugin(SimpleCommandPlugin):
             addplayer, rest = extract_name(data)
             first_name_color = addplayer
 
-        first_name = str(addplayer)
+        first_name = addplayer
         if on_ship:
             self.protocol.send_chat_message(
                 'Can\'t protect ships (at the moment)'
@@ -209,7 +262,7 @@ class PlanetProtectPlugin(SimpleCommandPlugin):
 
         if not data:
             if planet in self.protected_planets:
-                del self.player_planets[planet]
+                self.player_planets.pop(planet, None)
                 self.protected_planets.remove(planet)
                 self.protocol.send_chat_message(
                     'Planet successfully unprotected.'
@@ -218,7 +271,7 @@ class PlanetProtectPlugin(SimpleCommandPlugin):
             else:
                 self.protocol.send_chat_message('Planet is not protected!')
         else:
-            if first_name in self.player_planets[planet]:
+            if first_name in self.player_planets.get(planet, ()):
                 self.player_planets[planet].remove(first_name)
                 self.protocol.send_chat_message(
                     'Removed ^yellow;{}^green; from planet list'.format(
@@ -232,74 +285,122 @@ class PlanetProtectPlugin(SimpleCommandPlugin):
                 )
         self.save()
 
+    def state(self):
+        """
+        Returns a comparable snapshot of everything save() persists.
+        """
+        return (
+            frozenset(self.protected_planets),
+            tuple(
+                sorted(
+                    (planet, tuple(names))
+                    for planet, names in self.player_planets.iteritems()
+                )
+            ),
+            frozenset(self.blacklist),
+            self.protect_everything
+        )
+
+    def index_players(self):
+        """
+        Rebuilds the (planet, name) set used by the packet checks from
+        player_planets, which stays the authority (and keeps the order shown
+        by /protect_list).
+        """
+        self.planet_players = {
+            (planet, name)
+            for planet, names in self.player_planets.iteritems()
+            for name in names
+        }
+
     def save(self):
-        self.config.plugin_config.update(
+        state = self.state()
+        if state == self.saved_state:
+            return
+        self.saved_state = state
+        # Every change to player_planets, including the ones claims makes
+        # to the shared dict, is followed by a save.
+        self.index_players()
+        self.plugin_config.update(
             {
-                'protected_planets': self.protected_planets,
+                'protected_planets': list(self.protected_planets),
                 'player_planets': self.player_planets,
-                'blacklist': self.blacklist,
+                'blacklist': sorted(self.blacklist),
                 'protect_everything': self.protect_everything
             }
         )
-        self.config.save()
+        self.config.mark_dirty()
+
+    def is_restricted(self):
+        """
+        Whether the current player is on a protected planet without being
+        an admin or registered to it.
+        """
+        if not self.protected_planets:
+            return False
+        on_ship, planet = self.location()
+        if planet not in self.protected_planets:
+            return False
+        player = self.protocol.player
+        if player.access_level >= UserLevels.ADMIN:
+            return False
+        return (planet, player.org_name) not in self.planet_players
 
+    @restricted_only
     def on_entity_create(self, data):
         """
         Projectile protection check
         """
-        if (
-                self.protocol.player.planet in self.protected_planets and
-                self.protocol.player.access_level < UserLevels.ADMIN
-        ):
-            name = self.protocol.player.org_name
-            if name in self.player_planets[self.protocol.player.planet]:
-                return True
-            else:
-                entities = entity_create().parse(data.data)
-                for entity in entities.entity:
-                    self.logger.vdebug('Entity Type: %s', entity.entity_type)
-                    if entity.entity_type == EntityType.PROJECTILE:
-                        self.logger.vdebug('projectile detected')
-                        if self.block_all:
-                            return False
-                        p_type = star_string('').parse(entity.payload)
-                        self.logger.vdebug('projectile: %s', p_type)
-                        if p_type in self.blacklist:
-                            if p_type in ['water', 'glowingrain']:
-                                self.logger.vdebug(
-                                    'Player %s attempted to use a prohibited '
-                                    'projectile, %s, on a protected planet.',
-                                    self.protocol.player.org_name, p_type
-                                )
-                            else:
-                                self.logger.info(
-                                    'Player %s attempted to use a prohibited '
-                                    'projectile, %s, on a protected planet.',
-                                    self.protocol.player.org_name, p_type
-                                )
-                            return False
+        logger = self.logger
+        vdebug = logger.isEnabledFor(VDEBUG_LVL)
+        blacklist = self.blacklist
+        entities = ENTITY_CREATE.parse(data.data)
+        for entity in entities.entity:
+            entity_type = entity.entity_type
+            if vdebug:
+                logger.vdebug('Entity Type: %s', entity_type)
+            if entity_type == EntityType.PROJECTILE:
+                if vdebug:
+                    logger.vdebug('projectile detected')
+                if self.block_all:
+                    return False
+                p_type = STAR_STRING.parse(entity.payload)
+                if vdebug:
+                    logger.vdebug('projectile: %s', p_type)
+                if p_type in blacklist:
+                    # Weather projectiles are only worth a vdebug line; skip
+                    # the player lookup entirely when that is filtered out.
+                    if p_type not in ['water', 'glowingrain']:
+                        log = logger.info
+                    elif vdebug:
+                        log = logger.vdebug
+                    else:
+                        return False
+                    log(
+                        'Player %s attempted to use a prohibited '
+                        'projectile, %s, on a protected planet.',
+                        self.protocol.player.org_name, p_type
+                    )
+                    return False
 
+    @restricted_only
     def on_entity_interact_result(self, data):
         """
         Chest protection
         """
-        if (
-                self.protocol.player.planet in self.protected_planets and
-                self.protocol.player.access_level < UserLevels.ADMIN
-        ):
-            self.logger.vdebug(
-                'User %s attmepted to interact on a protected planet.',
-                self.protocol.player.name
+        logger = self.logger
+        vdebug = logger.isEnabledFor(VDEBUG_LVL)
+        if vdebug:
+            name = self.protocol.player.name
+            logger.vdebug(
+                'User %s attmepted to interact on a protected planet.', name
             )
-            name = self.protocol.player.org_name
-            if name in self.player_planets[self.protocol.player.planet]:
-                return True
-            else:
-                entity = entity_interact_result().parse(data.data)
-                if entity.interaction_type == InteractionType.OPEN_CONTAINER:
-                    self.logger.vdebug(
-                        'User %s attmepted to open container ID %s',
-                        self.protocol.player.name, entity.target_entity_id
-                    )
-                    self.logger.vdebug('This is not permitted.')
-                    return False
+        entity = ENTITY_INTERACT_RESULT.parse(data.data)
+        if entity.interaction_type == InteractionType.OPEN_CONTAINER:
+            if vdebug:
+                logger.vdebug(
+                    'User %s attmepted to open container ID %s',
+                    name, entity.target_entity_id
+                )
+                logger.vdebug('This is not permitted.')
+            return False
@@ -0,0 +1,140 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from packets import Packets
+from plugins.core.player_manager_plugin import UserLevels
+from plugins.planet_protect.planet_protect_plugin import PlanetProtectPlugin
+
+
+class PlanetProtectTestCase(TestCase):
+    def setUp(self):
+        self.plugin = PlanetProtectPlugin()
+        self.plugin.plugin_config = {
+            'bad_packets': [
+                'CONNECT_WIRE', 'MODIFY_TILE_LIST', 'NOT_A_PACKET'
+            ],
+            'protected_planets': ['protected'],
+            'player_planets': {'protected': ['allowed']},
+            'blacklist': [],
+            'protect_everything': False
+        }
+        self.plugin.config = Mock()
+        self.plugin.logger = Mock()
+        self.plugin.plugins = {
+            'player_manager_plugin': Mock(),
+            'command_plugin': Mock()
+        }
+        self.plugin.activate()
+
+    def set_player(
+        self, access_level, org_name='player', planet='protected',
+        on_ship=False
+    ):
+        protocol = Mock(spec=['player', 'send_chat_message'])
+        protocol.player = Mock(
+            access_level=access_level,
+            org_name=org_name,
+            planet=planet,
+            on_ship=on_ship,
+            admin_logged_in=1
+        )
+        self.plugin.protocol = protocol
+        return protocol
+
+    def test_activate_maps_bad_packets(self):
+        connect_wire = self.plugin.overridden_packets[
+            Packets.CONNECT_WIRE.value
+        ]['on']
+        modify_tile_list = self.plugin.overridden_packets[
+            Packets.MODIFY_TILE_LIST.value
+        ]['on']
+        self.assertIs(connect_wire, modify_tile_list)
+        self.assertEqual(self.plugin.logger.warning.call_count, 1)
+        self.assertIn(
+            'NOT_A_PACKET', self.plugin.logger.warning.call_args[0]
+        )
+
+        self.set_player(UserLevels.GUEST)
+        self.assertFalse(connect_wire(Mock()))
+        self.set_player(UserLevels.GUEST, planet='unprotected')
+        self.assertTrue(connect_wire(Mock()))
+
+    def test_planet_check(self):
+        self.set_player(UserLevels.GUEST)
+        self.assertFalse(self.plugin.planet_check())
+        self.assertTrue(self.plugin.is_restricted())
+
+        self.set_player(UserLevels.REGISTERED)
+        self.assertFalse(self.plugin.planet_check())
+        self.assertTrue(self.plugin.is_restricted())
+
+        self.set_player(UserLevels.GUEST, org_name='allowed')
+        self.assertTrue(self.plugin.planet_check())
+        self.assertFalse(self.plugin.is_restricted())
+
+        self.set_player(UserLevels.ADMIN)
+        self.assertTrue(self.plugin.planet_check())
+        self.assertFalse(self.plugin.is_restricted())
+
+        self.set_player(UserLevels.GUEST, planet='unprotected')
+        self.assertTrue(self.plugin.planet_check())
+        self.assertFalse(self.plugin.is_restricted())
+
+        self.set_player(UserLevels.GUEST, on_ship=True)
+        self.assertTrue(self.plugin.planet_check())
+
+    def test_planet_check_protect_everything(self):
+        self.plugin.protect_everything = True
+
+        self.set_player(UserLevels.GUEST, planet='unprotected')
+        self.assertFalse(self.plugin.planet_check())
+
+        self.set_player(UserLevels.REGISTERED, planet='unprotected')
+        self.assertTrue(self.plugin.planet_check())
+
+    def test_after_world_start_clears_location(self):
+        protocol = self.set_player(UserLevels.GUEST)
+        self.assertFalse(self.plugin.planet_check())
+
+        protocol.player.planet = 'unprotected'
+        self.assertFalse(self.plugin.planet_check())
+
+        self.plugin.after_world_start(Mock())
+        self.assertTrue(self.plugin.planet_check())
+        self.assertEqual(
+            protocol.planet_protect_location, (False, 'unprotected')
+        )
+
+    def test_save_skips_unchanged_state(self):
+        self.plugin.save()
+        self.assertFalse(self.plugin.config.mark_dirty.called)
+
+        self.plugin.protect_everything = True
+        self.plugin.save()
+        self.assertEqual(self.plugin.config.mark_dirty.call_count, 1)
+        self.assertTrue(self.plugin.plugin_config['protect_everything'])
+
+        self.plugin.save()
+        self.assertEqual(self.plugin.config.mark_dirty.call_count, 1)
+
+    def test_protect_and_unprotect_update_index(self):
+        self.set_player(
+            UserLevels.MODERATOR, org_name='moderator', planet='new'
+        )
+
+        self.plugin.protect([])
+        self.assertIn('new', self.plugin.protected_planets)
+        self.assertIn(('new', 'moderator'), self.plugin.planet_players)
+        self.assertListEqual(
+            self.plugin.plugin_config['player_planets']['new'], ['moderator']
+        )
+
+        self.plugin.unprotect(['moderator'])
+        self.assertNotIn(('new', 'moderator'), self.plugin.planet_players)
+        self.assertIn('new', self.plugin.protected_planets)
+
+        self.plugin.unprotect([])
+        self.assertNotIn('new', self.plugin.protected_planets)
+        self.assertNotIn('new', self.plugin.plugin_config['player_planets'])
+        self.assertEqual(self.plugin.config.mark_dirty.call_count, 3)
@@ -24,21 +24,22 @@ class WebGuiPlugin(BasePlugin):
     def __init__(self, *args, **kwargs):
         super(WebGuiPlugin, self).__init__(*args, **kwargs)
         try:
-            self.port = int(self.config.plugin_config['port'])
+            self.port = int(self.plugin_config['port'])
         except (AttributeError, ValueError):
             self.port = 8083
-        self.ownerpassword = self.config.plugin_config['ownerpassword']
-        self.restart_script = self.config.plugin_config['restart_script']
+        self.ownerpassword = self.plugin_config['ownerpassword']
+        self.restart_script = self.plugin_config['restart_script']
         if (
-                self.config.plugin_config['cookie_token'] == '' or
-                not self.config.plugin_config['remember_cookie_token']
+                self.plugin_config['cookie_token'] == '' or
+                not self.plugin_config['remember_cookie_token']
         ):
             self.cookie_token = self.generate_cookie_token()
-            self.config.plugin_config['cookie_token'] = (
+            self.plugin_config['cookie_token'] = (
                 self.generate_cookie_token()
             )
+            self.config.mark_dirty()
         else:
-            self.cookie_token = self.config.plugin_config['cookie_token']
+            self.cookie_token = self.plugin_config['cookie_token']
         self.messages = []
         self.messages_log = []
 
@@ -47,7 +48,7 @@ class WebGuiPlugin(BasePlugin):
         self.player_manager = (
             self.plugins['player_manager_plugin'].player_manager
         )
-        web_gui.WebGuiApp.config = self.config.plugin_config
+        web_gui.WebGuiApp.config = self.plugin_config
         self.web_gui_app = web_gui.WebGuiApp(
             port=self.port,
             ownerpassword=self.ownerpassword,
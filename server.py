@@ -32,12 +32,13 @@ from config import ConfigurationManager
 from packet_stream import PacketStream
 import packets
 from plugin_manager import PluginManager, route, FatalPluginError
-from utility_functions import build_packet
+from utility_functions import build_packet, VDEBUG_LVL
 
-VERSION = '1.7.2'
 
+CHAT_RECEIVED = chat_received()
+
+VERSION = '1.7.2'
 
-VDEBUG_LVL = 9
 logging.addLevelName(VDEBUG_LVL, 'VDEBUG')
 
 
@@ -49,6 +50,33 @@ def vdebug(self, message, *args, **kws):
 logging.Logger.vdebug = vdebug
 
 
+def build_chat_packet(text, mode='BROADCAST', channel='', name=''):
+    """
+    Builds a complete CHAT_RECEIVED packet for a single line of text.
+
+    :return: The packet, ready to be written to a client transport.
+    :rtype : str
+    """
+    chat_data = CHAT_RECEIVED.build(
+        Container(
+            mode=mode,
+            channel=channel,
+            client_id=0,
+            name=name,
+            message=text.encode('utf-8')
+        )
+    )
+    chat_packet = build_packet(packets.Packets.CHAT_RECEIVED, chat_data)
+    if logger.isEnabledFor(VDEBUG_LVL):
+        # The hex dumps are built eagerly, so only pay for them when the
+        # messages are actually going to be emitted.
+        logger.vdebug('Built chat payload. Data: %s', chat_data.encode('hex'))
+        logger.vdebug(
+            'Built chat packet. Data: %s', chat_packet.encode('hex')
+        )
+    return chat_packet
+
+
 def port_check(upstream_hostname, upstream_port):
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     sock.settimeout(1)
@@ -527,7 +555,7 @@ class StarryPyServerProtocol(Protocol):
             for line in lines:
                 self.send_chat_message(line)
             return
-        if self.player is not None:
+        if self.player is not None and logger.isEnabledFor(VDEBUG_LVL):
             logger.vdebug(
                 'Calling send_chat_message from player %s on channel'
                 ' %s with mode %s with reported username of %s with'
@@ -538,21 +566,7 @@ class StarryPyServerProtocol(Protocol):
                 name,
                 text
             )
-        chat_data = chat_received().build(
-            Container(
-                mode=mode,
-                channel=channel,
-                client_id=0,
-                name=name,
-                message=text.encode('utf-8')
-            )
-        )
-        logger.vdebug('Built chat payload. Data: %s', chat_data.encode('hex'))
-        chat_packet = build_packet(
-            packets.Packets.CHAT_RECEIVED, chat_data
-        )
-        logger.vdebug('Built chat packet. Data: %s', chat_packet.encode('hex'))
-        self.transport.write(chat_packet)
+        self.transport.write(build_chat_packet(text, mode, channel, name))
         logger.vdebug('Sent chat message with text: %s', text)
 
     def write(self, data):
@@ -712,12 +726,16 @@ class StarryPyServerFactory(ServerFactory):
 
     def stopFactory(self):
         """
-        Called when the factory is stopped. Saves the configuration.
+        Called when the factory is stopped. Saves the configuration after
+        deactivating the plugins, so that anything they store on the way
+        out, or still have waiting on a delayed save, is written.
         :return: None
         """
 
-        self.config.save()
-        self.plugin_manager.die()
+        try:
+            self.plugin_manager.die()
+        finally:
+            self.config.save()
 
     def broadcast(self, text, name=''):
         """
@@ -728,9 +746,17 @@ class StarryPyServerFactory(ServerFactory):
         :param name: The name to prepend before the message, format is <name>
         :return: None
         """
+        # The packet is the same for everyone, so build it once.
+        try:
+            chat_packet = ''.join(
+                build_chat_packet(line) for line in text.split('\n')
+            )
+        except:
+            logger.exception('Exception in broadcast.')
+            return
         for p in self.protocols.itervalues():
             try:
-                p.send_chat_message(text)
+                p.transport.write(chat_packet)
             except:
                 logger.exception('Exception in broadcast.')
 
@@ -834,16 +860,18 @@ if __name__ == '__main__':
     config = ConfigurationManager()
 
     logger = logging.getLogger('starrypy')
-    logger.setLevel(9)
     log_format = logging.Formatter(
         '%(asctime)s - %(levelname)s - %(name)s # %(message)s'
     )
     if config.log_level == 'DEBUG':
         log_level = logging.DEBUG
     elif config.log_level == 'VDEBUG':
-        log_level = 'VDEBUG'
+        log_level = VDEBUG_LVL
     else:
         log_level = logging.INFO
+    # Filter on the logger as well as the handlers, so isEnabledFor() lets
+    # callers skip building messages that would be dropped anyway.
+    logger.setLevel(log_level)
 
     print('Setup console logging...')
     console_handle = logging.StreamHandler(sys.stdout)
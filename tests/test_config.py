@@ -0,0 +1,69 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from config import ConfigurationManager
+
+
+class ConfigurationManagerSaveTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        # Skip __init__, which loads the real config files.
+        self.manager = ConfigurationManager.__new__(ConfigurationManager)
+        self.manager._dirty = False
+        self.manager._save_pending = None
+        self.manager._last_saved = None
+        self.manager.config_path = Mock(
+            path=os.path.join(self.tmpdir, 'config.json')
+        )
+        self.manager.__dict__['config'] = {u'test': u'value'}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    @patch('config.io.open', side_effect=io.open)
+    @patch('config.reactor')
+    def test_mark_dirty_coalesces_saves(self, mock_reactor, mock_open):
+        self.manager.mark_dirty()
+        self.manager.mark_dirty()
+        self.manager.test = u'changed'
+
+        self.assertEqual(mock_reactor.callLater.call_count, 1)
+        delay, flush = mock_reactor.callLater.call_args[0]
+        self.assertEqual(delay, ConfigurationManager.save_delay)
+        self.assertFalse(mock_open.called)
+
+        flush()
+        self.assertEqual(mock_open.call_count, 1)
+        with io.open(self.manager.config_path.path) as f:
+            self.assertIn('"changed"', f.read())
+
+        self.manager.mark_dirty()
+        self.assertEqual(mock_reactor.callLater.call_count, 2)
+
+    @patch('config.io.open', side_effect=io.open)
+    @patch('config.reactor')
+    def test_save_cancels_pending_save(self, mock_reactor, mock_open):
+        pending = mock_reactor.callLater.return_value
+        pending.active.return_value = True
+        self.manager.mark_dirty()
+
+        self.manager.save()
+        self.assertTrue(pending.cancel.called)
+        self.assertIsNone(self.manager._save_pending)
+        self.assertFalse(self.manager._dirty)
+        self.assertEqual(mock_open.call_count, 1)
+
+    @patch('config.io.open', side_effect=io.open)
+    def test_save_skips_unchanged_content(self, mock_open):
+        self.manager.save()
+        self.manager.save()
+        self.assertEqual(mock_open.call_count, 1)
+
+        self.manager.config[u'test'] = u'changed'
+        self.manager.save()
+        self.assertEqual(mock_open.call_count, 2)
@@ -1,8 +1,10 @@
+from types import ModuleType
 from unittest import TestCase
 
 from mock import Mock, patch, call
 
-from plugin_manager import PluginManager, route
+from base_plugin import BasePlugin
+from plugin_manager import DetachedPluginConfig, PluginManager, route
 
 
 class PluginManagetTestCase(TestCase):
@@ -200,42 +202,237 @@ class PluginManagetTestCase(TestCase):
             }
         )
 
+    @patch('plugin_manager.sys')
+    @patch('plugin_manager.path')
+    @patch('plugin_manager.ConfigurationManager')
+    def test_dispatch_follows_mapping(self, mock_config, mock_path, mock_sys):
+        mock_plugin = Mock()
+        mock_plugin.name = 'Test'
+        mock_plugin.overridden_packets = {
+            1: {
+                'on': 'add me on 1',
+                'after': 'add me after 1'
+            }
+        }
+
+        pm = PluginManager(Mock())
+        pm.map_plugin_packets(mock_plugin)
+        self.assertDictEqual(
+            pm.dispatch,
+            {
+                (1, 'on'): ((mock_plugin, 'add me on 1'),),
+                (1, 'after'): ((mock_plugin, 'add me after 1'),)
+            }
+        )
+
+        pm.de_map_plugin_packets(mock_plugin)
+        self.assertDictEqual(pm.dispatch, {})
+
+    @patch('plugin_manager.sys')
+    @patch('plugin_manager.path')
+    @patch('plugin_manager.ConfigurationManager')
+    def test_do(self, mock_config, mock_path, mock_sys):
+        mock_plugin = Mock()
+        mock_plugin.name = 'Test'
+        mock_method = Mock(return_value=None)
+        mock_plugin.overridden_packets = {1: {'on': mock_method}}
+        mock_protocol = Mock()
+
+        pm = PluginManager(Mock())
+        pm.map_plugin_packets(mock_plugin)
+
+        self.assertTrue(pm.do(mock_protocol, 'on', Mock(id=1)))
+        self.assertTrue(mock_method.called)
+        self.assertIs(mock_plugin.protocol, mock_protocol)
+        self.assertTrue(pm.do(mock_protocol, 'on', Mock(id=2)))
+
+        mock_method.return_value = False
+        self.assertFalse(pm.do(mock_protocol, 'on', Mock(id=1)))
+
+    @patch('plugin_manager.sys')
+    @patch('plugin_manager.path')
+    @patch('plugin_manager.ConfigurationManager')
+    def test_resolve_dependencies_chain(
+        self, mock_config, mock_path, mock_sys
+    ):
+        pm = PluginManager(Mock())
+        pm.plugin_classes = {'a': 'A', 'b': 'B', 'c': 'C'}
+
+        pm.resolve_dependencies({'a': set(), 'b': {'a'}, 'c': {'b'}})
+
+        self.assertListEqual(pm.load_order, ['a', 'b', 'c'])
+        self.assertDictEqual(
+            pm.plugins_waiting_to_load, {'a': 'A', 'b': 'B', 'c': 'C'}
+        )
+
+    @patch('plugin_manager.sys')
+    @patch('plugin_manager.path')
+    @patch('plugin_manager.ConfigurationManager')
+    def test_resolve_dependencies_on_active_plugin(
+        self, mock_config, mock_path, mock_sys
+    ):
+        pm = PluginManager(Mock())
+        pm.plugins = {'core': Mock()}
+        pm.plugin_classes = {'core': 'Core', 'a': 'A'}
+
+        pm.resolve_dependencies({'a': {'core'}})
+
+        self.assertListEqual(pm.load_order, ['a'])
+        self.assertDictEqual(pm.plugins_waiting_to_load, {'a': 'A'})
+
+    @patch.object(PluginManager, 'logger')
+    @patch('plugin_manager.sys')
+    @patch('plugin_manager.path')
+    @patch('plugin_manager.ConfigurationManager')
+    def test_resolve_dependencies_missing(
+        self, mock_config, mock_path, mock_sys, mock_logger
+    ):
+        pm = PluginManager(Mock())
+        pm.plugin_classes = {'a': 'A', 'b': 'B'}
+
+        pm.resolve_dependencies({'a': set(), 'b': {'missing'}})
+
+        self.assertListEqual(pm.load_order, ['a'])
+        self.assertTrue(mock_logger.critical.called)
+        self.assertIn(
+            'Dependency of b on missing not met',
+            mock_logger.critical.call_args[0][0]
+        )
+
+    @patch.object(PluginManager, 'logger')
+    @patch('plugin_manager.sys')
+    @patch('plugin_manager.path')
+    @patch('plugin_manager.ConfigurationManager')
+    def test_resolve_dependencies_circular(
+        self, mock_config, mock_path, mock_sys, mock_logger
+    ):
+        pm = PluginManager(Mock())
+        pm.plugin_classes = {'a': 'A', 'b': 'B', 'c': 'C'}
+
+        pm.resolve_dependencies({'a': {'b'}, 'b': {'a'}, 'c': set()})
+
+        self.assertListEqual(pm.load_order, ['c'])
+        self.assertTrue(mock_logger.critical.called)
+        message = mock_logger.critical.call_args[0][0]
+        self.assertIn('Dependency of a on b not met', message)
+        self.assertIn('Dependency of b on a not met', message)
+
+    @patch('plugin_manager.__import__', create=True)
+    @patch('plugin_manager.sys')
+    @patch('plugin_manager.path')
+    @patch('plugin_manager.ConfigurationManager')
+    def test_import_plugin_skips_known(
+        self, mock_config, mock_path, mock_sys, mock_import
+    ):
+        class KnownPlugin(BasePlugin):
+            name = 'known'
+
+        class NewPlugin(BasePlugin):
+            name = 'new'
+
+        mod = ModuleType('test_plugin')
+        mod.BasePlugin = BasePlugin
+        mod.KnownPlugin = KnownPlugin
+        mod.NewPlugin = NewPlugin
+        mock_import.return_value = mod
+        pm = PluginManager(Mock())
+        pm.config.config = {}
+        pm.plugin_classes = {'known': 'already registered'}
+
+        pm.import_plugin('test_plugin')
+        self.assertEqual(mock_import.call_count, 1)
+        self.assertDictEqual(
+            pm.plugin_classes,
+            {'known': 'already registered', 'new': NewPlugin}
+        )
+        self.assertIn('test_plugin', pm.imported_plugins)
+
+        pm.import_plugin('test_plugin')
+        self.assertEqual(mock_import.call_count, 1)
+
+    @patch('plugin_manager.__import__', create=True)
+    @patch('plugin_manager.sys')
+    @patch('plugin_manager.path')
+    @patch('plugin_manager.ConfigurationManager')
+    def test_import_plugin_binds_plugin_config(
+        self, mock_config, mock_path, mock_sys, mock_import
+    ):
+        class ConfiguredPlugin(BasePlugin):
+            name = 'configured'
+
+        class UnconfiguredPlugin(BasePlugin):
+            name = 'unconfigured'
+
+        mod = ModuleType('test_plugin')
+        mod.ConfiguredPlugin = ConfiguredPlugin
+        mod.UnconfiguredPlugin = UnconfiguredPlugin
+        mock_import.return_value = mod
+        section = {'setting': 1}
+        pm = PluginManager(Mock())
+        pm.config.config = {'plugin_config': {'configured': section}}
+
+        pm.import_plugin('test_plugin')
+        self.assertIs(ConfiguredPlugin.plugin_config, section)
+        self.assertDictEqual(UnconfiguredPlugin.plugin_config, {})
+        self.assertDictEqual(
+            pm.config.config['plugin_config'], {'configured': section}
+        )
+
+        UnconfiguredPlugin.plugin_config['setting'] = 2
+        self.assertIs(
+            pm.config.config['plugin_config']['unconfigured'],
+            UnconfiguredPlugin.plugin_config
+        )
+        self.assertDictEqual(
+            pm.config.config['plugin_config']['unconfigured'], {'setting': 2}
+        )
+
+    def test_detached_plugin_config_attaches_on_update(self):
+        sections = {}
+        plugin_config = DetachedPluginConfig(sections, 'test')
+        self.assertEqual(plugin_config.get('setting', 'default'), 'default')
+        self.assertDictEqual(sections, {})
+
+        plugin_config.update({'setting': 1})
+        self.assertIs(sections['test'], plugin_config)
+        self.assertEqual(sections['test']['setting'], 1)
+
 
 class RouteTestCase(TestCase):
     @patch('plugin_manager.reactor')
-    @patch('plugin_manager.deferLater')
-    @patch('plugin_manager.logging')
-    def test_route_response_true(self, mock_logging, mock_defer, mock_reactor):
+    def test_route_response_true(self, mock_reactor):
         test_func = Mock()
         mock_pm = Mock()
+        mock_pm.dispatch = {(1, 'after'): ()}
         mock_self = Mock()
         mock_self.plugin_manager = mock_pm
-        add_err_back = Mock()
-        mock_defer.return_value = add_err_back
-        logger = Mock()
-        mock_logging.getLogger.return_value = logger
+        data = Mock(id=1)
 
         test_f = route(test_func)
-        test_f(mock_self, 'data')
+        test_f(mock_self, data)
 
-        mock_pm.do.assert_called_with(mock_self, 'on', 'data')
-        mock_defer.assert_called_with(
-            mock_reactor, .01, mock_pm.do, mock_self, 'after', 'data'
+        mock_pm.do.assert_called_with(mock_self, 'on', data)
+        test_func.assert_called_with(mock_self, data)
+        mock_reactor.callLater.assert_called_with(
+            0, mock_pm.do, mock_self, 'after', data
         )
-        self.assertTrue(add_err_back.addErrback.called)
-        self.assertTrue(mock_logging.getLogger.called)
 
-        error_callback = add_err_back.addErrback.call_args[0][0]
-        self.assertFalse(logger.error.called)
-        error_callback('test')
-        self.assertTrue(logger.error.called)
+    @patch('plugin_manager.reactor')
+    def test_route_no_after_handlers(self, mock_reactor):
+        test_func = Mock()
+        mock_pm = Mock()
+        mock_pm.dispatch = {(1, 'on'): ()}
+        mock_self = Mock()
+        mock_self.plugin_manager = mock_pm
+
+        test_f = route(test_func)
+        test_f(mock_self, Mock(id=1))
+
+        self.assertTrue(test_func.called)
+        self.assertFalse(mock_reactor.callLater.called)
 
     @patch('plugin_manager.reactor')
-    @patch('plugin_manager.deferLater')
-    @patch('plugin_manager.logging')
-    def test_route_response_false(
-        self, mock_logging, mock_defer, mock_reactor
-    ):
+    def test_route_response_false(self, mock_reactor):
         test_func = Mock()
         mock_pm = Mock()
         mock_pm.do.return_value = False
@@ -246,7 +443,8 @@ class RouteTestCase(TestCase):
         test_f(mock_self, 'data')
 
         mock_pm.do.assert_called_with(mock_self, 'on', 'data')
-        self.assertFalse(mock_defer.called)
+        self.assertFalse(test_func.called)
+        self.assertFalse(mock_reactor.callLater.called)
 
     @patch.object(PluginManager, 'deactivate_plugins')
     def test_die(self, mock_deactivate):
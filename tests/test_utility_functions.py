@@ -0,0 +1,69 @@
+from unittest import TestCase
+
+from construct import Container
+
+import packets
+import utility_functions
+from utility_functions import build_packet, extract_name
+
+
+class ExtractNameTestCase(TestCase):
+    def test_unquoted(self):
+        self.assertEqual(extract_name(['bob', 'x']), ('bob', ['x']))
+        self.assertEqual(extract_name(['bob']), ('bob', []))
+
+    def test_quoted_multiple_tokens(self):
+        self.assertEqual(
+            extract_name(['"big', 'bob"', 'x', 'y']), ('big bob', ['x', 'y'])
+        )
+        self.assertEqual(
+            extract_name(["'big", 'old', "bob'"]), ('big old bob', None)
+        )
+
+    def test_quoted_single_token(self):
+        self.assertEqual(extract_name(['"bob"']), ('bob', None))
+        self.assertEqual(extract_name(["'bob'", 'x']), ('bob', ['x']))
+
+    def test_unterminated(self):
+        with self.assertRaises(ValueError) as cm:
+            extract_name(['"bob', 'x'])
+        self.assertEqual(
+            str(cm.exception), 'Final terminator character of <"> not found'
+        )
+        with self.assertRaises(ValueError):
+            extract_name(['"bob\'', 'x'])
+
+
+class BuildPacketTestCase(TestCase):
+    def construct_build(self, packet_type, data):
+        return packets.packet().build(
+            Container(id=packet_type, payload_size=len(data), data=data)
+        )
+
+    def test_matches_construct(self):
+        limit = utility_functions._payload_size_cache_limit
+        # Lengths around each signed VLQ byte boundary and the cache limit.
+        lengths = [
+            0, 1, 63, 64, 65, 8191, 8192, 8193,
+            limit - 1, limit, limit + 1, 1048575, 1048576
+        ]
+        for length in lengths:
+            data = 'x' * length
+            expected = self.construct_build(
+                packets.Packets.CHAT_RECEIVED, data
+            )
+            # The second call exercises the cached size header.
+            self.assertEqual(
+                build_packet(packets.Packets.CHAT_RECEIVED, data), expected
+            )
+            self.assertEqual(
+                build_packet(packets.Packets.CHAT_RECEIVED, data), expected
+            )
+
+    def test_cache_limit(self):
+        limit = utility_functions._payload_size_cache_limit
+        build_packet(packets.Packets.CHAT_RECEIVED, 'x' * (limit - 1))
+        build_packet(packets.Packets.CHAT_RECEIVED, 'x' * limit)
+
+        self.assertIn(limit - 1, utility_functions._payload_size_cache)
+        self.assertNotIn(limit, utility_functions._payload_size_cache)
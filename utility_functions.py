@@ -1,13 +1,35 @@
-import collections
 import logging
 import os
 import errno
+import re
 
-from construct import Container
 from twisted.python.filepath import FilePath
 
 import packets
 
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+try:
+    # ujson is an optional, faster parser. It rounds floats and can't hold
+    # ints of 2**64 or more, so only use it for read-only data where that
+    # can't matter; anything that gets written back uses the json module.
+    import ujson as fast_json
+except ImportError:
+    import json as fast_json
+
+
+SIGNED_VLQ = packets.SignedVLQ('')
+# Encoded payload size headers for the common (small) packet sizes.
+_payload_size_cache = {}
+_payload_size_cache_limit = 16384
+# A name wrapped in matching quotes, then optionally the rest of the line.
+QUOTED_NAME = re.compile(r'^([\'"])(.*?)\1(?:\s+(.*))?$', re.S)
+
+# Verbose debug level, registered as VDEBUG by server.py.
+VDEBUG_LVL = 9
 
 path = FilePath(os.path.dirname(os.path.abspath(__file__)))
 logger = logging.getLogger('starrypy.utility_functions')
@@ -40,28 +62,40 @@ def give_item_to_player(player_protocol, item, count=1):
             hard_max
         )
         item_count = hard_max
+    if item_count <= 0:
+        return 0
     maximum = 1000
-    given = 0
-    while item_count > 0:
-        x = item_count
-        if x > maximum:
-            x = maximum
-        item_packet = build_packet(
-            packets.Packets.GIVE_ITEM, packets.give_item_write(item, x + 1)
+    given = item_count
+    # Full stacks are identical, so build that packet once; the remainder
+    # gets a packet of its own. Everything goes out in a single write.
+    full_stacks, remainder = divmod(item_count, maximum)
+    item_packets = []
+    if full_stacks:
+        item_packets.extend(
+            [
+                build_packet(
+                    packets.Packets.GIVE_ITEM,
+                    packets.give_item_write(item, maximum + 1)
+                )
+            ] * full_stacks
         )
-        player_protocol.transport.write(item_packet)
-        item_count -= x
-        given += x
+    if remainder:
+        item_packets.append(
+            build_packet(
+                packets.Packets.GIVE_ITEM,
+                packets.give_item_write(item, remainder + 1)
+            )
+        )
+    player_protocol.transport.writeSequence(item_packets)
     return given
 
 
 def recursive_dictionary_update(d, u):
     for k, v in u.iteritems():
-        if isinstance(v, collections.Mapping):
-            r = recursive_dictionary_update(d.get(k, {}), v)
-            d[k] = r
+        if isinstance(v, Mapping):
+            d[k] = recursive_dictionary_update(d.get(k, {}), v)
         else:
-            d[k] = u[k]
+            d[k] = v
     return d
 
 
@@ -73,14 +107,16 @@ def build_packet(packet_type, data):
     :return: The build packet.
     :rtype : str
     """
+    # Same bytes as packets.packet().build(), without going through
+    # construct for the fixed id byte and the size header.
     length = len(data)
-    return packets.packet().build(
-        Container(
-            id=packet_type,
-            payload_size=length,
-            data=data
-        )
-    )
+    try:
+        payload_size = _payload_size_cache[length]
+    except KeyError:
+        payload_size = SIGNED_VLQ.build(length)
+        if length < _payload_size_cache_limit:
+            _payload_size_cache[length] = payload_size
+    return chr(packet_type) + payload_size + data
 
 
 class Planet(object):
@@ -118,23 +154,23 @@ def move_ship_to_coords(protocol, x, y, z, planet, satellite):
 
 
 def extract_name(l):
-    name = []
+    """
+    Splits a (possibly quoted) player name off the front of a list of
+    command arguments.
+
+    :param l: Command arguments, as split on whitespace.
+    :return: Tuple of the name and the remaining arguments (None if there
+             are none left after a quoted name).
+    """
     if l[0][0] not in ["'", '"']:
         return l[0], l[1:]
-    name.append(l[0][1:])
-    terminator = l[0][0]
-    for idx, s in enumerate(l[1:]):
-        if s[-1] == terminator:
-            name.append(s[:-1])
-            if idx + 2 != len(l):
-                return ' '.join(name), l[idx + 2:]
-            else:
-                return ' '.join(name), None
-        else:
-            name.append(s)
-    raise ValueError(
-        'Final terminator character of <%s> not found'.format(terminator)
-    )
+    match = QUOTED_NAME.match(' '.join(l))
+    if match is None:
+        raise ValueError(
+            'Final terminator character of <{}> not found'.format(l[0][0])
+        )
+    name, rest = match.group(2), match.group(3)
+    return name, (rest.split() if rest else None)
 
 
 def verify_path(path):